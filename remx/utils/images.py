@@ -1,9 +1,31 @@
+import contextlib
+import functools
 import os
+import random
+import shutil
+import string
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice, repeat
+
 import cv2
 import numpy as np
 
+try:
+    import numba
+except ImportError:  # Numba is optional, the NumPy implementations are used without it
+    numba = None
+
+try:
+    import imagesize
+except ImportError:  # Only needed by `find_image_size`
+    imagesize = None
+
 # import sys  # for cli implementation
 
+_LETTERS = string.ascii_lowercase
+
 
 # Resolve files overwritten or disappearing.
 # The new filenames clash and result in overwriting of old of same base filename in subfolder.
@@ -18,12 +40,7 @@ def generate_random_string(length=6):
     :return: The function `generate_random_string` returns a randomly generated string of lowercase
     letters with a length specified by the `length` parameter.
     """
-    import random
-    import string
-
-    """Generate a random string of fixed length."""
-    letters = string.ascii_lowercase
-    return "".join(random.choice(letters) for i in range(length))
+    return "".join(random.choices(_LETTERS, k=length))
 
 
 def img_rename(folder_path: str):
@@ -37,25 +54,41 @@ def img_rename(folder_path: str):
     """
     import datetime
 
-    for root, dirnames, filenames in os.walk(folder_path):
-        for dirname in dirnames:
-            i = 1
-            nested_folder_path = os.path.join(root, dirname)
-            for filename in os.listdir(nested_folder_path):
-                if filename.endswith(".jpg") or filename.endswith(".png"):
-                    base_filename, file_extension = os.path.splitext(filename)
+    # Scan every directory exactly once: its subdirectories are queued for scanning and, for
+    # nested directories only, its images are renamed after the directory name
+    pending = [(folder_path, None)]
+    while pending:
+        dir_path, dirname = pending.pop()
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+
+        timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                pending.append((entry.path, entry.name))
+            elif (
+                dirname is not None
+                and entry.name.endswith((".jpg", ".png"))
+                and entry.is_file()
+            ):
+                file_extension = os.path.splitext(entry.name)[1]
+
+                # All the files of a directory share the timestamp, so draw a new random string
+                # until the name is free instead of letting `os.rename` overwrite an image
+                while True:
                     random_string = generate_random_string(4)
-                    timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
                     new_filename = (
                         f"{dirname}-{timestamp}-{random_string}{file_extension}"
                     )
-                    os.rename(
-                        os.path.join(nested_folder_path, filename),
-                        os.path.join(nested_folder_path, new_filename),
-                    )
+                    new_path = os.path.join(dir_path, new_filename)
+                    if not os.path.exists(new_path):
+                        break
+                os.rename(entry.path, new_path)
 
 
 class ImgSize:
+    __slots__ = ("width", "height", "channel")
+
     def __init__(self, width: int, height: int, channel: int = 3) -> None:
         self.height = height
         self.width = width
@@ -65,36 +98,125 @@ class ImgSize:
         return (self.width, self.height, self.channel)
 
 
-def letterbox(img: np.ndarray, new_size: ImgSize, fill_value: int = 114) -> np.ndarray:
+def _interpolation(src_shape: tuple, dst_size: tuple) -> int:
+    """
+    Pick the `cv2.resize` interpolation for resizing an image of `src_shape` (HWC) to `dst_size`
+    (width, height): `INTER_AREA` when either axis shrinks, `INTER_LINEAR` otherwise.
+    """
+    dst_w, dst_h = dst_size
+    src_h, src_w = src_shape[:2]
+    return cv2.INTER_AREA if dst_w < src_w or dst_h < src_h else cv2.INTER_LINEAR
+
+
+# Resize backend, selected with the `REMX_RESIZE` environment variable: "cv2" (default) or "pil",
+# which runs on the SIMD kernels of pillow-simd when it is installed in place of Pillow
+_RESIZE_BACKEND = os.environ.get("REMX_RESIZE", "cv2")
+if _RESIZE_BACKEND not in ("cv2", "pil"):
+    raise ValueError(
+        f"Unknown REMX_RESIZE backend '{_RESIZE_BACKEND}', expected 'cv2' or 'pil'"
+    )
+
+
+def _resize(img: np.ndarray, dst_size: tuple, dst: np.ndarray = None) -> np.ndarray:
+    """
+    Resize `img` to `dst_size` (width, height) with the configured backend. `dst` is an optional
+    output buffer, only used by the "cv2" backend.
+    """
+    interpolation = _interpolation(img.shape, dst_size)
+
+    if _RESIZE_BACKEND == "pil":
+        from PIL import Image
+
+        # Pillow never looks at the channel order, so BGR images go through unchanged
+        resample = Image.BOX if interpolation == cv2.INTER_AREA else Image.BILINEAR
+        return np.asarray(Image.fromarray(img).resize(dst_size, resample))
+    return cv2.resize(img, dst_size, dst=dst, interpolation=interpolation)
+
+
+def letterbox(
+    img: np.ndarray, new_size: ImgSize, fill_value: int = 114, dst: np.ndarray = None
+) -> np.ndarray:
+    # `dst` is an optional output buffer, it is reused when it already has the letterboxed shape
     # [why fill_value = 114](https://github.com/ultralytics/ultralytics/blob/796bac229eb5040159d7dff549f136f8c7e1c64e/ultralytics/data/augment.py#L587)
-    aspect_ratio = min(new_size.height / img.shape[1], new_size.width / img.shape[0])
+    aspect_ratio = min(new_size.width / img.shape[1], new_size.height / img.shape[0])
 
     new_size_with_ar = int(img.shape[1] * aspect_ratio), int(
         img.shape[0] * aspect_ratio
     )
 
-    resized_img = np.asarray(cv2.resize(img, new_size_with_ar))
+    resized_img = _resize(img, new_size_with_ar)
     resized_h, resized_w, _ = resized_img.shape
 
-    padded_img = np.full(new_size.get_tuple(), fill_value)
-    center_x = new_size.width / 2
-    center_y = new_size.height / 2
+    # Split the padding between both sides, the extra pixel of an odd padding goes bottom/right
+    top = (new_size.height - resized_h) // 2
+    bottom = new_size.height - resized_h - top
+    left = (new_size.width - resized_w) // 2
+    right = new_size.width - resized_w - left
+
+    padded_img = cv2.copyMakeBorder(
+        resized_img,
+        top,
+        bottom,
+        left,
+        right,
+        cv2.BORDER_CONSTANT,
+        dst=dst,
+        value=(fill_value,) * new_size.channel,
+    )
+    return padded_img
 
-    x_range_start = int(center_x - (resized_w / 2))
-    x_range_end = int(center_x + (resized_w / 2))
 
-    y_range_start = int(center_y - (resized_h / 2))
-    y_range_end = int(center_y + (resized_h / 2))
+_IMG_SUFFIXES = (".jpg", ".jpeg", ".png")
 
-    padding_width = new_size.width - resized_w
-    padding_height = new_size.height - resized_h
+# Output buffers of `_resize_one`, one set per worker thread (or process)
+_buffers = threading.local()
 
-    padded_img[y_range_start:y_range_end, x_range_start:x_range_end, :] = resized_img
-    return padded_img
+
+def _iter_images(root: str, relroot: str = ""):
+    """
+    Recursively yield `(path, relpath)` for every image below `root`, where `relpath` is relative
+    to the `root` of the outermost call.
+    """
+    with os.scandir(root) as it:
+        entries = list(it)
+
+    for entry in entries:
+        relpath = os.path.join(relroot, entry.name)
+        if entry.is_dir(follow_symlinks=False):
+            yield from _iter_images(entry.path, relpath)
+        elif entry.name.lower().endswith(_IMG_SUFFIXES) and entry.is_file():
+            yield entry.path, relpath
+
+
+def _resize_one(src_path: str, dst_path: str, new_size: ImgSize, letter_box: bool):
+    """Resize (or letterbox) the image at `src_path` to `new_size` and save it to `dst_path`."""
+    # Load the image
+    img = cv2.imread(src_path)
+
+    # Write into this worker's buffer from the previous image, OpenCV only allocates a new one
+    # when the output shape changes
+    if letter_box:
+        resized_img = letterbox(img, new_size, dst=getattr(_buffers, "padded", None))
+        _buffers.padded = resized_img
+    else:
+        resized_img = _resize(
+            img,
+            (new_size.width, new_size.height),
+            dst=getattr(_buffers, "resized", None),
+        )
+        _buffers.resized = resized_img
+
+    # Save the resized image to the output directory
+    cv2.imwrite(dst_path, resized_img)
 
 
 def img_resize(
-    input_dir: str, output_dir: str, img_size: tuple, letter_box: bool = True
+    input_dir: str,
+    output_dir: str,
+    img_size: tuple,
+    letter_box: bool = True,
+    workers: int = None,
+    use_processes: bool = False,
 ):
     """
     The `img_resize` function resizes images in a given input directory to a specified size and saves
@@ -113,39 +235,60 @@ def img_resize(
     resized while maintaining their aspect ratio by adding black bars to the sides or top/bottom of the
     image, defaults to True
     :type letterbox: bool (optional)
+    :param workers: The `workers` parameter is the number of threads (or processes) used to resize
+    the images in parallel, defaults to the number of CPUs
+    :type workers: int (optional)
+    :param use_processes: The `use_processes` parameter is a boolean flag that selects a process pool
+    instead of a thread pool. Processes sidestep the GIL for the Python work around each image, which
+    pays off when the images are small, defaults to False
+    :type use_processes: bool (optional)
     """
     # Check if the directory exists
     if not os.path.exists(output_dir):
         # Create the directory if it does not exist
         os.makedirs(output_dir)
 
-    # Loop through all subdirectories in the input directory
-    for root, dirs, files in os.walk(input_dir):
-        # Loop through all files in the subdirectory
-        for filename in files:
-            # Check if the file is an image
-            if (
-                filename.endswith(".jpg")
-                or filename.endswith(".jpeg")
-                or filename.endswith(".png")
-            ):
-                # Load the image
-                img = cv2.imread(os.path.join(root, filename))
+    # Collect the images of all subdirectories in the input directory
+    src_paths, dst_paths = [], []
+    for src_path, relpath in _iter_images(input_dir):
+        src_paths.append(src_path)
+        dst_paths.append(os.path.join(output_dir, relpath))
 
-                if letter_box:
-                    resized_img = letterbox(
-                        np.asarray(img), ImgSize(img_size[0], img_size[1])
-                    )
-                else:
-                    # Resize the image to 640x640
-                    resized_img = cv2.resize(img, img_size)
+    # Create the output subdirectories up front so the workers never race on them
+    for output_subdir in {os.path.dirname(dst_path) for dst_path in dst_paths}:
+        os.makedirs(output_subdir, exist_ok=True)
+
+    # OpenCV releases the GIL while decoding, resizing and encoding, so threads overlap the I/O;
+    # processes also run the Python bookkeeping around each image in parallel
+    workers = workers or os.cpu_count() or 1
+    executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+    # Send the tasks to the processes in chunks to amortize the IPC (ignored by threads)
+    chunksize = max(1, len(src_paths) // (workers * 4))
 
-                # Save the resized image to the output directory
-                output_subdir = os.path.join(
-                    output_dir, os.path.relpath(root, input_dir)
+    # The pool already resizes one image per worker, so keep OpenCV from starting threads of its
+    # own on top of it; worker processes get the same setting through the pool initializer
+    pool_kwargs = (
+        {"initializer": cv2.setNumThreads, "initargs": (1,)} if use_processes else {}
+    )
+    cv2_threads = cv2.getNumThreads()
+    cv2.setNumThreads(1)
+
+    new_size = ImgSize(img_size[0], img_size[1])
+    try:
+        with executor_cls(max_workers=workers, **pool_kwargs) as executor:
+            list(
+                executor.map(
+                    _resize_one,
+                    src_paths,
+                    dst_paths,
+                    repeat(new_size),
+                    repeat(letter_box),
+                    chunksize=chunksize,
                 )
-                os.makedirs(output_subdir, exist_ok=True)
-                cv2.imwrite(os.path.join(output_subdir, filename), resized_img)
+            )
+    finally:
+        cv2.setNumThreads(cv2_threads)
 
 
 from typing import List, Tuple
@@ -155,6 +298,112 @@ from typing import List, Tuple
 # where (x1, y1) is the top-left corner and (x2, y2) bottom-right corener of single bounding box
 BBox = Tuple[float, float, float, float]  # (x1, y1, x2, y2) for single bounding box
 
+# Number of boxes from which the Numba kernels are used, below it the NumPy version is as fast
+_NUMBA_MIN_ROWS = 1 << 14
+
+if numba is not None:
+    # Single-pass kernels over (N, 4) arrays that write straight into `out` without temporaries.
+    # `fastmath` is left off so the results stay bit-identical to the NumPy implementations.
+    @numba.njit(parallel=True, cache=True)
+    def _transform_bboxes_nb(bboxes, aspect_ratio, ox, oy, inverse, out):
+        for i in numba.prange(bboxes.shape[0]):
+            if inverse:
+                out[i, 0] = bboxes[i, 0] / aspect_ratio - ox
+                out[i, 1] = bboxes[i, 1] / aspect_ratio - oy
+                out[i, 2] = bboxes[i, 2] / aspect_ratio - ox
+                out[i, 3] = bboxes[i, 3] / aspect_ratio - oy
+            else:
+                out[i, 0] = (bboxes[i, 0] + ox) * aspect_ratio
+                out[i, 1] = (bboxes[i, 1] + oy) * aspect_ratio
+                out[i, 2] = (bboxes[i, 2] + ox) * aspect_ratio
+                out[i, 3] = (bboxes[i, 3] + oy) * aspect_ratio
+
+    @numba.njit(parallel=True, cache=True)
+    def _xyxy2xywh_nb(x, out):
+        for i in numba.prange(x.shape[0]):
+            out[i, 0] = (x[i, 0] + x[i, 2]) / 2  # x center
+            out[i, 1] = (x[i, 1] + x[i, 3]) / 2  # y center
+            out[i, 2] = x[i, 2] - x[i, 0]  # width
+            out[i, 3] = x[i, 3] - x[i, 1]  # height
+
+
+def _use_numba(arr: np.ndarray) -> bool:
+    """Whether `arr` is a large enough `(N, 4)` float array to be handed to the Numba kernels."""
+    return (
+        numba is not None
+        and arr.ndim == 2
+        and arr.shape[1] == 4
+        and arr.shape[0] >= _NUMBA_MIN_ROWS
+        and arr.dtype.kind == "f"
+    )
+
+
+def _letterbox_params(original_size: ImgSize, letterboxed_size: ImgSize) -> tuple:
+    """
+    Return the `(aspect_ratio, pad_w, pad_h)` used to letterbox an image of `original_size` into
+    `letterboxed_size`.
+    """
+    # Calculate the aspect ratio of the original and letterboxed sizes
+    aspect_ratio = min(
+        letterboxed_size.width / original_size.width,
+        letterboxed_size.height / original_size.height,
+    )
+
+    # Calculate the amount of padding added during the letterbox operation
+    pad_w = letterboxed_size.width - (aspect_ratio * original_size.width)
+    pad_h = letterboxed_size.height - (aspect_ratio * original_size.height)
+    return aspect_ratio, pad_w, pad_h
+
+
+def _transform_bboxes_np(
+    bboxes_arr: np.ndarray,
+    aspect_ratio: float,
+    pad_w: float,
+    pad_h: float,
+    inverse: bool = False,
+) -> np.ndarray:
+    """
+    Map a `(N, 4)` array of `(x1, y1, x2, y2)` bounding boxes to (or, with `inverse`, back from)
+    the letterboxed image dimensions. The result is left unrounded.
+    """
+    # Loop-invariant padding offsets in original image pixels, computed once for all the boxes
+    ox = pad_w / (2 * aspect_ratio)
+    oy = pad_h / (2 * aspect_ratio)
+    if _use_numba(bboxes_arr):
+        out = np.empty_like(bboxes_arr)
+        _transform_bboxes_nb(bboxes_arr, aspect_ratio, ox, oy, inverse, out)
+        return out
+
+    offset = np.array([ox, oy, ox, oy])
+
+    # The second operation of each branch is done in place on the first one's result
+    if inverse:
+        out = bboxes_arr / aspect_ratio
+        out -= offset
+    else:
+        out = bboxes_arr + offset
+        out *= aspect_ratio
+    return out
+
+
+def _normalize_bboxes_np(
+    bboxes_arr: np.ndarray, original_size: ImgSize, letterboxed_size: ImgSize
+) -> np.ndarray:
+    """
+    Map a `(N, 4)` array of `(x1, y1, x2, y2)` bounding boxes to the letterboxed image and normalize
+    them by its width and height in a single pass.
+    """
+    aspect_ratio, pad_w, pad_h = _letterbox_params(original_size, letterboxed_size)
+
+    # (x + pad / (2 * ar)) * ar / size == x * (ar / size) + pad / (2 * size)
+    sx = aspect_ratio / letterboxed_size.width
+    sy = aspect_ratio / letterboxed_size.height
+    ox = pad_w / (2 * letterboxed_size.width)
+    oy = pad_h / (2 * letterboxed_size.height)
+    out = bboxes_arr * np.array([sx, sy, sx, sy])
+    out += np.array([ox, oy, ox, oy])
+    return out
+
 
 def letterbox_coordinate_transform(
     bboxes: List[BBox], original_size: ImgSize, letterboxed_size: ImgSize
@@ -178,29 +427,13 @@ def letterbox_coordinate_transform(
     :return: a list of transformed bounding boxes in the letterboxed image dimensions.
     """
 
-    # Calculate the aspect ratio of the original and letterboxed sizes
-    aspect_ratio = min(
-        letterboxed_size.height / original_size.width,
-        letterboxed_size.width / original_size.height,
-    )
-
-    # Calculate the amount of padding added during the letterbox operation
-    pad_w = letterboxed_size.width - (aspect_ratio * original_size.width)
-    pad_h = letterboxed_size.height - (aspect_ratio * original_size.height)
+    aspect_ratio, pad_w, pad_h = _letterbox_params(original_size, letterboxed_size)
 
     # Convert the bounding box coordinates to the letterboxed image dimensions
-    letterboxed_bboxes = []
-    for bbox in bboxes:
-        x1, y1, x2, y2 = bbox
-        # (x1, y1) is the top-left corner of single bounding box
-        map_x1 = round((x1 + pad_w / (2 * aspect_ratio)) * aspect_ratio)
-        map_y1 = round((y1 + pad_h / (2 * aspect_ratio)) * aspect_ratio)
-
-        # (x2, y2) is the bottom-right corner of single bounding box
-        map_x2 = round((x2 + pad_w / (2 * aspect_ratio)) * aspect_ratio)
-        map_y2 = round((y2 + pad_h / (2 * aspect_ratio)) * aspect_ratio)
-        letterboxed_bboxes.append((map_x1, map_y1, map_x2, map_y2))
-    return letterboxed_bboxes
+    bboxes_arr = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    letterboxed_bboxes = _transform_bboxes_np(bboxes_arr, aspect_ratio, pad_w, pad_h)
+    np.rint(letterboxed_bboxes, out=letterboxed_bboxes)
+    return [tuple(bbox) for bbox in letterboxed_bboxes.astype(np.int64).tolist()]
 
 
 def coordinate_normalize(
@@ -226,103 +459,148 @@ def coordinate_normalize(
     :return: a list of normalized coordinates.
     """
 
-    letterbox_coordinate = letterbox_coordinate_transform(
-        bboxes=bboxes, original_size=original_size, letterboxed_size=letterboxed_size
+    bboxes_arr = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    normalized_coordinate = _normalize_bboxes_np(
+        bboxes_arr, original_size=original_size, letterboxed_size=letterboxed_size
     )
 
-    normalized_coordinate = []
-    for bbox in letterbox_coordinate:
-        x1, y1, x2, y2 = bbox
-        normalized_coordinate.append(
-            (
-                x1 / letterboxed_size.width,
-                y1 / letterboxed_size.height,
-                x2 / letterboxed_size.width,
-                y2 / letterboxed_size.height,
-            )
-        )
-
-    return normalized_coordinate
+    return [tuple(bbox) for bbox in normalized_coordinate.tolist()]
 
 
 def xyxy2xywh(x: np.array):
     """
     Convert bounding box (x1, y1, x2, y2) to bounding box (x, y, w, h).
     """
-    y = np.copy(x)
+    y = np.empty_like(x)
+    if _use_numba(x):
+        _xyxy2xywh_nb(x, y)
+        return y
+
     y[..., 0] = (x[..., 0] + x[..., 2]) / 2  # x center
     y[..., 1] = (x[..., 1] + x[..., 3]) / 2  # y center
     y[..., 2] = x[..., 2] - x[..., 0]  # width
     y[..., 3] = x[..., 3] - x[..., 1]  # height
+    y[..., 4:] = x[..., 4:]  # extra columns (e.g. score, class) are kept as they are
     return y
 
 
+# Row format of a label file: class label, kept as written, followed by four coordinates
+_LABEL_FMT = "%s %.7g %.7g %.7g %.7g\n"
+
+
+# Number of label rows parsed at a time, bounds the memory used by very large label files
+_LABEL_CHUNK_ROWS = 1 << 16
+
+
+def _parse_labels(lines: list, dtype=np.float32) -> tuple:
+    """
+    Split label file lines into their labels, kept as text, and an `(N, 4)` array of their
+    coordinates. Lines that do not have the 5 fields of a label row are skipped.
+    """
+    rows = [fields for fields in map(str.split, lines) if len(fields) == 5]
+    labels = [fields[0] for fields in rows]
+    coords = np.array([fields[1:] for fields in rows], dtype=dtype).reshape(-1, 4)
+    return labels, coords
+
+
+def _format_labels(labels: list, coords: np.ndarray) -> str:
+    """Format the labels and their `(N, 4)` coordinates as label file text in one operation."""
+    rows = np.empty((len(labels), 5), dtype=object)
+    rows[:, 0] = labels
+    rows[:, 1:] = coords
+    return _LABEL_FMT * len(labels) % tuple(rows.ravel().tolist())
+
+
+def _iter_label_chunks(file, dtype=np.float32):
+    """Yield `(labels, coords)` for every `_LABEL_CHUNK_ROWS` lines of an open label file."""
+    while True:
+        lines = list(islice(file, _LABEL_CHUNK_ROWS))
+        if not lines:
+            return
+        yield _parse_labels(lines, dtype=dtype)
+
+
+def _rewrite_label_files(labels_dir: str, converters: dict, dtype=np.float32):
+    """
+    Rewrite the label files of `labels_dir` in `converters`, which maps each file path to the
+    function converting an `(N, 4)` array of its coordinates.
+    """
+    # Convert every file into a temporary file first, so a file that fails to parse leaves the
+    # whole directory untouched instead of half converted
+    tmp_paths = {}
+    try:
+        for file_path, convert in converters.items():
+            # A fresh temporary file, so no file of the user is overwritten or removed
+            fd, tmp_path = tempfile.mkstemp(dir=labels_dir, suffix=".tmp")
+            tmp_paths[file_path] = tmp_path
+
+            # Stream the file in chunks of [label, x1, y1, x2, y2] rows, so only one chunk is
+            # held in memory however large the file is
+            with open(fd, "w") as dst, open(file_path, "r") as src:
+                for labels, coords in _iter_label_chunks(src, dtype=dtype):
+                    # Convert the coordinates of the chunk in a single batch
+                    dst.write(_format_labels(labels, convert(coords)))
+    except BaseException:
+        for tmp_path in tmp_paths.values():
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+        raise
+
+    # Overwrite the text files with the updated coordinates
+    for file_path, tmp_path in tmp_paths.items():
+        # `mkstemp` creates the file readable by its owner only, keep the original permissions
+        shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+
+        print(f"Updated coordinates in {os.path.basename(file_path)}")
+
+
 # TODO(Adam-Al-Rahman): In future make it to work for multiple folder where labels_dir take list of label folders
 def labels_dir_xyxy2xywh(labels_dir: str):
     "Convert text file from labels directory. [x1, y1, x2, y2] -> [x_center, y_center, width, height]"
 
-    # Iterate through the text files in the directory
-    for filename in os.listdir(labels_dir):
-        if filename.endswith(".txt"):
-            file_path = os.path.join(labels_dir, filename)
-
-            # Read the content of the text file
-            with open(file_path, "r") as file:
-                lines = file.readlines()
+    # Convert the text files in the directory
+    _rewrite_label_files(
+        labels_dir,
+        {
+            os.path.join(labels_dir, filename): xyxy2xywh
+            for filename in os.listdir(labels_dir)
+            if filename.endswith(".txt")
+        },
+    )
 
-                # Process and convert coordinate from xyxy to xywh
-                updated_lines = []
-                for line in lines:
-                    parts = line.strip().split(" ")
-                    if len(parts) == 5:
-                        label, xmin, ymin, xmax, ymax = parts
 
-                        # Convert the coordinates to float values
-                        xmin, ymin, xmax, ymax = map(float, [xmin, ymin, xmax, ymax])
+# Function to find the size (width and height) of an image by its name
+def find_image_size(img_dir, image_name):
+    if imagesize is None:
+        raise ImportError("find_image_size requires the 'imagesize' package")
 
-                        x_center, y_center, width, height = xyxy2xywh(
-                            np.array([xmin, ymin, xmax, ymax])
-                        )
-                        updated_line = (
-                            f"{label} {x_center} {y_center} {width} {height}\n"
-                        )
-                        updated_lines.append(updated_line)
+    image_path = os.path.join(img_dir, image_name)
 
-                # Overwrite the text file with the updated coordinates
-                with open(file_path, "w") as file:
-                    file.writelines(updated_lines)
+    if os.path.exists(image_path):
+        # Only the image header is parsed, the pixel data is never decoded
+        width, height = imagesize.get(image_path)
 
-                print(f"Updated coordinates in {filename}")
+        # `imagesize` reports (-1, -1) instead of raising for unreadable or unknown files
+        if width <= 0 or height <= 0:
+            return None
+        return width, height
+    else:
+        return None
 
 
 # TODO(Vijay-J0shi): Optimize the code to handle relative paths
 def img_label_map(labels_dir, img_dir):
-    from PIL import Image
-
     # Iterate through the text files in the directory
+    converters = {}
     for filename in os.listdir(labels_dir):
         if filename.endswith(".txt"):
             file_path = os.path.join(labels_dir, filename)
 
-            # Read the content of the text file
-            with open(file_path, "r") as file:
-                lines = file.readlines()
-
             # Extract the image name from the filename
             image_name = filename.replace(".txt", ".jpg")
 
-            # Function to find the size (width and height) of an image by its name
-            def find_image_size(image_name):
-                image_path = os.path.join(img_dir, image_name)
-
-                if os.path.exists(image_path):
-                    with Image.open(image_path) as img:
-                        width, height = img.size
-                        return width, height
-                else:
-                    return None
-
-            image_size = find_image_size(image_name)
+            image_size = find_image_size(img_dir, image_name)
 
             if image_size is not None:
                 width = image_size[0]
@@ -330,36 +608,17 @@ def img_label_map(labels_dir, img_dir):
 
                 print(width, height)
 
-                # Process and resize each line in the text file
-                updated_lines = []
-                for line in lines:
-                    parts = line.strip().split(" ")
-                    if len(parts) == 5:
-                        label, xmin, ymin, xmax, ymax = parts
-
-                        # Convert the coordinates to float values
-                        xmin, ymin, xmax, ymax = map(float, [xmin, ymin, xmax, ymax])
-
-                        coordinate = coordinate_normalize(
-                            bboxes=[(xmin, ymin, xmax, ymax)],
-                            original_size=ImgSize(width, height),
-                            letterboxed_size=ImgSize(640, 640),
-                        )
-
-                        updated_line = ""
-                        for bbox in coordinate:
-                            x1, y1, x2, y2 = bbox
-                            # Create the updated line
-                            updated_line = f"{label} {x1} {y1} {x2} {y2}\n"
-                        updated_lines.append(updated_line)
-
-                # Overwrite the text file with the updated coordinates
-                with open(file_path, "w") as file:
-                    file.writelines(updated_lines)
-
-                print(f"Updated coordinates in {filename}")
+                # Normalize the coordinates of the file against the size of its image
+                converters[file_path] = functools.partial(
+                    _normalize_bboxes_np,
+                    original_size=ImgSize(width, height),
+                    letterboxed_size=ImgSize(640, 640),
+                )
             else:
-                print(f"Image '{image_name}' not found.")
+                print(f"Image '{image_name}' not found or unreadable.")
+
+    # Overwrite the text files with the updated coordinates
+    _rewrite_label_files(labels_dir, converters, dtype=np.float64)
 
 
 def get_thickness_based_on_resolution(
@@ -424,32 +683,20 @@ def inverse_letterbox_coordinate_transform(
     :return: a list of bounding boxes in the original image dimensions.
     """
 
-    # Calculate the aspect ratio of the original and letterboxed sizes
-    aspect_ratio = min(
-        letterboxed_size.height / original_size.width,
-        letterboxed_size.width / original_size.height,
-    )
-
-    # Calculate the amount of padding added during the letterbox operation
-    pad_w = letterboxed_size.width - (aspect_ratio * original_size.width)
-    pad_h = letterboxed_size.height - (aspect_ratio * original_size.height)
+    aspect_ratio, pad_w, pad_h = _letterbox_params(original_size, letterboxed_size)
 
     # Convert the bounding box coordinates back to the original image dimensions
-    inverse_bboxes = []
-    for bbox in bboxes:
-        x1, y1, x2, y2 = bbox
-        # TODO(Adam-Al-Rahman): Better method than `round`
-        # (x1, y1) is the top-left corner of single bounding box
-        map_x1 = round(x1 / aspect_ratio - pad_w / (2 * aspect_ratio))
-        map_y1 = round(y1 / aspect_ratio - pad_h / (2 * aspect_ratio))
-
-        # (x2, y2) is the bottom-right corner of single bounding box
-        map_x2 = round(x2 / aspect_ratio - pad_w / (2 * aspect_ratio))
-        map_y2 = round(y2 / aspect_ratio - pad_h / (2 * aspect_ratio))
-        inverse_bboxes.append((map_x1, map_y1, map_x2, map_y2))
-    return inverse_bboxes
+    # TODO(Adam-Al-Rahman): Better method than `round`
+    bboxes_arr = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    inverse_bboxes = _transform_bboxes_np(
+        bboxes_arr, aspect_ratio, pad_w, pad_h, inverse=True
+    )
+    np.rint(inverse_bboxes, out=inverse_bboxes)
+    return [tuple(bbox) for bbox in inverse_bboxes.astype(np.int64).tolist()]
 
 
+# The pipeline is only built (and albumentations only imported) on the first call
+@functools.lru_cache(maxsize=1)
 def augmentation_transforms():
     import albumentations as A
 